@@ -0,0 +1,125 @@
+/**
+ * Bounded-timeout fetch with jittered exponential backoff
+ * Shared by the NVIDIA classifier and the Telegram notifier so no outbound
+ * request can hang on the OS default socket timeout
+ */
+
+import { Response } from "node-fetch";
+
+// Transient statuses worth another attempt; everything else returns to the
+// caller for its own error handling
+const RETRYABLE_STATUS = new Set([429, 500, 502, 503, 504]);
+
+// Socket-level errnos that tend to clear up on a retry. Permanent failures
+// (ENOTFOUND from a config typo, TLS certificate problems) are not listed:
+// retrying those only delays the real error
+const RETRYABLE_ERRNO = new Set([
+  "ECONNRESET",
+  "ECONNREFUSED",
+  "ETIMEDOUT",
+  "ESOCKETTIMEDOUT",
+  "EPIPE",
+  "EAI_AGAIN",
+]);
+
+/**
+ * Only transient errors earn another attempt: our own abort deadline
+ * (AbortError) and node-fetch "system" FetchErrors carrying a retryable
+ * errno. Everything else - DNS typos, certificate errors, programming
+ * errors thrown by the attempt callback - surfaces immediately.
+ */
+function isRetryableError(error: unknown): boolean {
+  if (!error || typeof error !== "object") {
+    return false;
+  }
+  const err = error as { name?: string; type?: string; code?: string };
+  if (err.name === "AbortError") {
+    return true;
+  }
+  return err.type === "system" && RETRYABLE_ERRNO.has(err.code || "");
+}
+
+export function sleep(ms: number): Promise<void> {
+  return new Promise((resolve) => setTimeout(resolve, ms));
+}
+
+/**
+ * Keep the attempt deadline armed until the response body settles. fetch
+ * resolves as soon as the headers arrive, so clearing the timer there would
+ * leave later body reads (json/text/buffer) with no timeout at all: a
+ * connection that wedges mid-body would hang forever. The timer is cleared
+ * when the body ends, errors or closes; if the deadline fires first, the
+ * abort tears the read down.
+ */
+function releaseOnBodySettled(
+  response: Response,
+  timer: NodeJS.Timeout
+): void {
+  const body = response.body as any;
+  if (!body || typeof body.on !== "function") {
+    clearTimeout(timer);
+    return;
+  }
+
+  const release = () => clearTimeout(timer);
+  body.on("end", release);
+  body.on("error", release);
+  body.on("close", release);
+}
+
+/**
+ * Run a fetch attempt with a hard timeout, retrying transient failures with
+ * jittered exponential backoff (random 0..0.5*2^n seconds between tries).
+ * The attempt callback receives an AbortSignal and must build the request
+ * (including any body stream) fresh on each call, since streams cannot be
+ * replayed across attempts.
+ */
+export async function fetchWithRetry(
+  label: string,
+  attempt: (signal: AbortSignal) => Promise<Response>,
+  timeoutMs: number,
+  tries = 3
+): Promise<Response> {
+  let lastError: unknown;
+
+  for (let n = 0; n < tries; n++) {
+    const controller = new AbortController();
+    const timer = setTimeout(() => controller.abort(), timeoutMs);
+
+    try {
+      const response = await attempt(controller.signal);
+      if (!RETRYABLE_STATUS.has(response.status) || n === tries - 1) {
+        releaseOnBodySettled(response, timer);
+        return response;
+      }
+
+      // Destroy the unread error body: with keep-alive agents, node-fetch
+      // holds the socket out of the pool until the body is consumed, so an
+      // abandoned 429/5xx response would pin a connection per retry
+      if (response.body) {
+        (response.body as any).destroy?.();
+      }
+      clearTimeout(timer);
+
+      lastError = new Error(
+        `${label} failed with status ${response.status} ${response.statusText}`
+      );
+    } catch (error) {
+      clearTimeout(timer);
+      lastError = error;
+      if (n === tries - 1 || !isRetryableError(error)) {
+        throw error;
+      }
+    }
+
+    const backoffMs = Math.random() * 500 * 2 ** n;
+    console.warn(
+      `${label} failed (attempt ${n + 1}/${tries}), retrying in ${Math.round(
+        backoffMs
+      )}ms`
+    );
+    await sleep(backoffMs);
+  }
+
+  throw lastError;
+}
@@ -6,14 +6,13 @@
  */
 
 import fs from "fs/promises";
+import os from "os";
 import path from "path";
-import { createReadStream, existsSync, statSync } from "fs";
-import { lookup } from "mime-types";
+import { createReadStream, existsSync } from "fs";
+import { createHash } from "crypto";
+import { Agent } from "https";
 import fetch from "node-fetch";
-import { createWriteStream } from "fs";
-import { pipeline } from "stream/promises";
-import { createGunzip } from "zlib";
-import AdmZip from "adm-zip";
+import { fetchWithRetry } from "./httpRetry";
 
 // Types
 interface ClassificationResult {
@@ -38,6 +37,35 @@ interface ClassificationResponse {
   }>;
 }
 
+interface ClassifierOptions {
+  maxEdge?: number;
+  jpegQuality?: number;
+  cacheEnabled?: boolean;
+  cachePath?: string;
+  cacheTtlMs?: number;
+  maxCacheEntries?: number;
+  forceAsset?: boolean;
+}
+
+interface CacheEntry {
+  result: string;
+  ts: number;
+}
+
+interface PreparedPayload {
+  data?: Buffer; // present when the payload was recompressed in memory
+  filePath?: string; // present when the original file is sent unmodified
+  contentType: string;
+  size: number;
+}
+
+interface BatchItemResult {
+  image_path: string;
+  success: boolean;
+  classification?: string;
+  error?: string;
+}
+
 interface ResultData {
   timestamp: string;
   image_file: string;
@@ -50,6 +78,8 @@ interface ResultData {
 let API_KEY: string;
 let NVAi_URL: string;
 let ASSET_UPLOAD_URL: string;
+let UPLOAD_TIMEOUT_MS: number;
+let CLASSIFY_TIMEOUT_MS: number;
 
 try {
   // Try to load from config file
@@ -57,6 +87,9 @@ try {
   API_KEY = config.nvidia.apiKey;
   NVAi_URL = config.nvidia.apiUrl;
   ASSET_UPLOAD_URL = config.nvidia.assetUploadUrl;
+  UPLOAD_TIMEOUT_MS = (config.nvidia.uploadTimeoutSeconds || 30) * 1000;
+  CLASSIFY_TIMEOUT_MS =
+    (config.nvidia.classificationTimeoutSeconds || 300) * 1000;
 } catch (error) {
   console.error(
     "Failed to load config/config.js:",
@@ -66,20 +99,85 @@ try {
   API_KEY = process.env.NVIDIA_API_KEY || "";
   NVAi_URL = "https://ai.api.nvidia.com/v1/vlm/microsoft/florence-2";
   ASSET_UPLOAD_URL = "https://api.nvcf.nvidia.com/v2/nvcf/assets";
+  UPLOAD_TIMEOUT_MS = 30 * 1000;
+  CLASSIFY_TIMEOUT_MS = 300 * 1000;
 }
 
-if (!API_KEY) {
-  throw new Error(
-    "API_KEY must be set in config/config.js or as NVIDIA_API_KEY environment variable"
+// Payload preprocessing defaults: drone/phone photos are frequently 8-20MB
+// while the model tokenizes at a fixed resolution, so most of those bytes are
+// wasted bandwidth. Files below the threshold are sent as-is.
+const DEFAULT_MAX_EDGE = 1024;
+const DEFAULT_JPEG_QUALITY = 85;
+const RECOMPRESS_THRESHOLD_BYTES = 300_000;
+
+// Read size for streamed uploads: large enough to keep the socket fed,
+// small enough to bound memory while disk reads overlap socket writes
+const UPLOAD_CHUNK_BYTES = 1 << 20;
+
+// Payloads at or below this size are inlined as base64 in the classify
+// request itself (one round trip); larger ones go through the NVCF asset
+// upload flow (authorize + PUT + classify)
+const INLINE_THRESHOLD_BYTES = 180_000;
+
+// Tiny extension-to-mime map: the service only takes images, so this avoids
+// loading the full mime-types database on every process start
+const MIME_BY_EXTENSION: Record<string, string> = {
+  ".jpg": "image/jpeg",
+  ".jpeg": "image/jpeg",
+  ".png": "image/png",
+  ".webp": "image/webp",
+  ".gif": "image/gif",
+  ".bmp": "image/bmp",
+};
+
+function imageContentType(imagePath: string): string {
+  return (
+    MIME_BY_EXTENSION[path.extname(imagePath).toLowerCase()] || "image/jpeg"
   );
 }
 
+// Classification cache: a content-hash lookup (microseconds) replaces a full
+// network round trip when the same image bytes are classified again
+const DEFAULT_CACHE_PATH = path.join(
+  os.homedir(),
+  ".cache",
+  "aerialintel",
+  "classify.json"
+);
+
+// Bound the cache so a long-running process can never grow it without
+// limit; Map insertion order doubles as LRU order (hits re-insert)
+const DEFAULT_CACHE_MAX_ENTRIES = 512;
+
+// Coalesce bursts of inserts into a single file write instead of rewriting
+// the whole cache per classification
+const CACHE_PERSIST_DELAY_MS = 250;
+
+// sharp is optional: when it isn't installed, images are uploaded unmodified
+let sharpModule: any | null | undefined;
+
+function loadSharp(): any | null {
+  if (sharpModule === undefined) {
+    try {
+      sharpModule = require("sharp");
+    } catch (error) {
+      sharpModule = null;
+      console.warn(
+        "sharp not installed - images will be uploaded without recompression"
+      );
+    }
+  }
+  return sharpModule;
+}
+
 // Global debug flag
 let DEBUG_MODE = true; // Enable debug for troubleshooting
 
-function debugPrint(message: string): void {
+// Accepts a thunk so expensive messages (JSON.stringify, slicing) are only
+// formatted when debug output is actually enabled
+function debugPrint(message: string | (() => string)): void {
   if (DEBUG_MODE) {
-    console.log(message);
+    console.log(typeof message === "function" ? message() : message);
   }
 }
 
@@ -88,12 +186,239 @@ export class ImageClassifier {
   private apiUrl: string;
   private assetUploadUrl: string;
   private headerAuth: string;
-
-  constructor(apiKey?: string, apiUrl?: string, assetUploadUrl?: string) {
+  private httpsAgent: Agent;
+  private maxEdge: number;
+  private jpegQuality: number;
+  private cacheEnabled: boolean;
+  private cachePath: string;
+  private cacheTtlMs: number;
+  private memoryCache: Map<string, CacheEntry>;
+  private cacheLoaded: boolean;
+  private maxCacheEntries: number;
+  private persistTimer: NodeJS.Timeout | null;
+  private persistChain: Promise<void>;
+  private forceAsset: boolean;
+  private inflight: Map<string, Promise<string>>;
+  private authorizeHeaders: Record<string, string>;
+  private classifyHeaders: Record<string, string>;
+
+  constructor(
+    apiKey?: string,
+    apiUrl?: string,
+    assetUploadUrl?: string,
+    options: ClassifierOptions = {}
+  ) {
     this.apiKey = apiKey || API_KEY;
+    if (!this.apiKey) {
+      throw new Error(
+        "API_KEY must be set in config/config.js or as NVIDIA_API_KEY environment variable"
+      );
+    }
     this.apiUrl = apiUrl || NVAi_URL;
     this.assetUploadUrl = assetUploadUrl || ASSET_UPLOAD_URL;
     this.headerAuth = `Bearer ${this.apiKey}`;
+    this.maxEdge = options.maxEdge || DEFAULT_MAX_EDGE;
+    this.jpegQuality = options.jpegQuality || DEFAULT_JPEG_QUALITY;
+    this.cacheEnabled = options.cacheEnabled !== false;
+    this.cachePath = options.cachePath || DEFAULT_CACHE_PATH;
+    this.cacheTtlMs = options.cacheTtlMs || 0;
+    this.memoryCache = new Map();
+    this.cacheLoaded = false;
+    this.maxCacheEntries = options.maxCacheEntries || DEFAULT_CACHE_MAX_ENTRIES;
+    this.persistTimer = null;
+    this.persistChain = Promise.resolve();
+    this.forceAsset = options.forceAsset || false;
+    this.inflight = new Map();
+
+    // Static headers built once; per-call code only patches in the dynamic
+    // asset id fields when needed
+    this.authorizeHeaders = Object.freeze({
+      Authorization: this.headerAuth,
+      "Content-Type": "application/json",
+      accept: "application/json",
+    });
+    this.classifyHeaders = Object.freeze({
+      "Content-Type": "application/json",
+      Authorization: this.headerAuth,
+      Accept: "application/json",
+    });
+
+    // Keep-alive agent so repeated calls to the NVIDIA endpoints reuse TCP+TLS
+    // connections instead of paying a fresh handshake per request
+    this.httpsAgent = new Agent({
+      keepAlive: true,
+      keepAliveMsecs: 30000,
+      maxSockets: 32,
+      maxFreeSockets: 16,
+    });
+  }
+
+  /**
+   * Hash the image bytes so byte-identical duplicates share a cache entry.
+   * Streams the file through the hash in chunks, so the digest work is
+   * interleaved with I/O instead of blocking the event loop on one big
+   * buffer, and memory stays bounded for large captures.
+   */
+  private hashFile(imagePath: string): Promise<string> {
+    return new Promise((resolve, reject) => {
+      const hash = createHash("sha256");
+      const stream = createReadStream(imagePath, {
+        highWaterMark: UPLOAD_CHUNK_BYTES,
+      });
+      stream.on("data", (chunk) => hash.update(chunk));
+      stream.on("error", reject);
+      stream.on("end", () => resolve(hash.digest("hex")));
+    });
+  }
+
+  /**
+   * Load the persisted cache into memory (once per process)
+   */
+  private async loadCache(): Promise<void> {
+    if (this.cacheLoaded) {
+      return;
+    }
+    this.cacheLoaded = true;
+
+    try {
+      const raw = await fs.readFile(this.cachePath, "utf8");
+      const entries = JSON.parse(raw) as Record<string, CacheEntry>;
+      const now = Date.now();
+      for (const [key, entry] of Object.entries(entries)) {
+        if (!this.cacheTtlMs || now - entry.ts < this.cacheTtlMs) {
+          this.memoryCache.set(key, entry);
+        }
+      }
+      this.evictOverflow();
+      debugPrint(
+        `DEBUG: Loaded ${this.memoryCache.size} cached classifications`
+      );
+    } catch (error) {
+      // Cache file missing or corrupt - start fresh
+    }
+  }
+
+  private async cacheGet(key: string): Promise<string | undefined> {
+    await this.loadCache();
+    const entry = this.memoryCache.get(key);
+    if (!entry) {
+      return undefined;
+    }
+    if (this.cacheTtlMs && Date.now() - entry.ts >= this.cacheTtlMs) {
+      this.memoryCache.delete(key);
+      return undefined;
+    }
+
+    // Re-insert so Map insertion order tracks recency for eviction
+    this.memoryCache.delete(key);
+    this.memoryCache.set(key, entry);
+    return entry.result;
+  }
+
+  private async cachePut(key: string, result: string): Promise<void> {
+    await this.loadCache();
+    this.memoryCache.delete(key);
+    this.memoryCache.set(key, { result, ts: Date.now() });
+    this.evictOverflow();
+    this.schedulePersist();
+  }
+
+  /**
+   * Drop least recently used entries until the cache fits its bound
+   */
+  private evictOverflow(): void {
+    while (this.memoryCache.size > this.maxCacheEntries) {
+      const oldest = this.memoryCache.keys().next().value;
+      if (oldest === undefined) {
+        break;
+      }
+      this.memoryCache.delete(oldest);
+    }
+  }
+
+  /**
+   * Debounced persistence: bursts of inserts (batch mode, a busy stream)
+   * collapse into one file write, and writes are chained so two never
+   * overlap on the same path
+   */
+  private schedulePersist(): void {
+    if (this.persistTimer) {
+      return;
+    }
+    this.persistTimer = setTimeout(() => {
+      this.persistTimer = null;
+      this.persistChain = this.persistChain.then(() => this.persistCache());
+    }, CACHE_PERSIST_DELAY_MS);
+  }
+
+  private async persistCache(): Promise<void> {
+    try {
+      await fs.mkdir(path.dirname(this.cachePath), { recursive: true });
+
+      // Write to a per-process temp file and rename into place: rename is
+      // atomic, so readers never see a half-written cache even when several
+      // CLI invocations persist at the same time
+      const tmpPath = `${this.cachePath}.${process.pid}.tmp`;
+      await fs.writeFile(
+        tmpPath,
+        JSON.stringify(Object.fromEntries(this.memoryCache)),
+        "utf8"
+      );
+      await fs.rename(tmpPath, this.cachePath);
+    } catch (error) {
+      debugPrint(`DEBUG: Failed to persist classification cache: ${error}`);
+    }
+  }
+
+  /**
+   * Prepare the upload payload: downscale large images to maxEdge and
+   * re-encode as JPEG. Bytes-on-the-wire dominate upload time, and halving
+   * the pixel count roughly quarters the JPEG size, so oversized drone
+   * captures shrink dramatically. Small files are passed through untouched.
+   */
+  private async preparePayload(imagePath: string): Promise<PreparedPayload> {
+    const contentType = imageContentType(imagePath);
+
+    const stats = await fs.stat(imagePath);
+    if (stats.size < RECOMPRESS_THRESHOLD_BYTES) {
+      debugPrint(
+        `DEBUG: File is small (${stats.size} bytes), skipping recompression`
+      );
+      return { filePath: imagePath, contentType, size: stats.size };
+    }
+
+    const sharp = loadSharp();
+    if (!sharp) {
+      return { filePath: imagePath, contentType, size: stats.size };
+    }
+
+    try {
+      const recompressed = await sharp(imagePath)
+        .rotate()
+        .resize(this.maxEdge, this.maxEdge, {
+          fit: "inside",
+          withoutEnlargement: true,
+        })
+        .jpeg({ quality: this.jpegQuality })
+        .toBuffer();
+
+      if (recompressed.length < stats.size) {
+        debugPrint(
+          `DEBUG: Recompressed ${stats.size} -> ${recompressed.length} bytes`
+        );
+        return {
+          data: recompressed,
+          contentType: "image/jpeg",
+          size: recompressed.length,
+        };
+      }
+
+      debugPrint("DEBUG: Recompression did not shrink file, using original");
+    } catch (error) {
+      debugPrint(`DEBUG: Recompression failed, using original: ${error}`);
+    }
+
+    return { filePath: imagePath, contentType, size: stats.size };
   }
 
   /**
@@ -101,53 +426,58 @@ export class ImageClassifier {
    */
   async uploadAsset(
     imagePath: string,
-    description = "Test Image"
+    description = "Test Image",
+    preparedPayload?: PreparedPayload
   ): Promise<string> {
     debugPrint(`DEBUG: Starting asset upload for ${imagePath}`);
 
-    let contentType = lookup(imagePath) || "image/jpeg";
-    if (!contentType.startsWith("image/")) {
-      contentType = "image/jpeg";
-    }
+    const payload = preparedPayload || (await this.preparePayload(imagePath));
+    const contentType = payload.contentType;
     debugPrint(`DEBUG: Content type: ${contentType}`);
 
     try {
       debugPrint("DEBUG: Sending authorization request...");
       debugPrint(`DEBUG: Using asset upload URL: ${this.assetUploadUrl}`);
       debugPrint(
-        `DEBUG: Request headers: ${JSON.stringify({
-          Authorization: "Bearer [REDACTED]",
-          "Content-Type": "application/json",
-          accept: "application/json",
-        })}`
+        () =>
+          `DEBUG: Request headers: ${JSON.stringify({
+            Authorization: "Bearer [REDACTED]",
+            "Content-Type": "application/json",
+            accept: "application/json",
+          })}`
       );
       debugPrint(
-        `DEBUG: Request body: ${JSON.stringify({
-          contentType,
-          description,
-        })}`
+        () =>
+          `DEBUG: Request body: ${JSON.stringify({
+            contentType,
+            description,
+          })}`
       );
 
-      const authorizeResponse = await fetch(this.assetUploadUrl, {
-        method: "POST",
-        headers: {
-          Authorization: this.headerAuth,
-          "Content-Type": "application/json",
-          accept: "application/json",
-        },
-        body: JSON.stringify({
-          contentType,
-          description,
-        }),
-      });
+      const authorizeResponse = await fetchWithRetry(
+        "Asset authorization",
+        (signal) =>
+          fetch(this.assetUploadUrl, {
+            method: "POST",
+            agent: this.httpsAgent,
+            headers: this.authorizeHeaders,
+            body: JSON.stringify({
+              contentType,
+              description,
+            }),
+            signal,
+          }),
+        UPLOAD_TIMEOUT_MS
+      );
 
       debugPrint(
         `DEBUG: Authorization response status: ${authorizeResponse.status}`
       );
       debugPrint(
-        `DEBUG: Authorization response headers: ${JSON.stringify(
-          Object.fromEntries(authorizeResponse.headers.entries())
-        )}`
+        () =>
+          `DEBUG: Authorization response headers: ${JSON.stringify(
+            Object.fromEntries(authorizeResponse.headers.entries())
+          )}`
       );
 
       if (!authorizeResponse.ok) {
@@ -161,25 +491,41 @@ export class ImageClassifier {
       const authResponse =
         (await authorizeResponse.json()) as AssetUploadResponse;
       debugPrint(
-        `DEBUG: Authorization response keys: ${Object.keys(authResponse)}`
+        () => `DEBUG: Authorization response keys: ${Object.keys(authResponse)}`
       );
 
       const uploadUrl = authResponse.uploadUrl;
       debugPrint(
-        `DEBUG: Upload URL obtained: ${uploadUrl.substring(0, 50)}...`
+        () => `DEBUG: Upload URL obtained: ${uploadUrl.substring(0, 50)}...`
       );
 
       debugPrint("DEBUG: Uploading file...");
 
-      const fileStream = createReadStream(imagePath);
-      const uploadResponse = await fetch(uploadUrl, {
-        method: "PUT",
-        body: fileStream,
-        headers: {
-          "x-amz-meta-nvcf-asset-description": description,
-          "content-type": contentType,
-        },
-      });
+      // Recompressed payloads are already in memory; pass-through files are
+      // streamed in fixed-size chunks so the whole image never sits in RSS.
+      // The explicit Content-Length avoids chunked transfer encoding, which
+      // the S3-style upload endpoint rejects. The body is built inside the
+      // retry callback because a file stream cannot be replayed.
+      const uploadResponse = await fetchWithRetry(
+        "Asset upload",
+        (signal) =>
+          fetch(uploadUrl, {
+            method: "PUT",
+            agent: this.httpsAgent,
+            body: payload.data
+              ? payload.data
+              : createReadStream(payload.filePath!, {
+                  highWaterMark: UPLOAD_CHUNK_BYTES,
+                }),
+            headers: {
+              "x-amz-meta-nvcf-asset-description": description,
+              "content-type": contentType,
+              "Content-Length": String(payload.size),
+            },
+            signal,
+          }),
+        UPLOAD_TIMEOUT_MS
+      );
 
       debugPrint(`DEBUG: Upload response status: ${uploadResponse.status}`);
 
@@ -189,6 +535,10 @@ export class ImageClassifier {
         );
       }
 
+      // Drain the (empty) PUT response body so the keep-alive socket is
+      // released back to the pool and the body deadline is cleared
+      await uploadResponse.text();
+
       const assetId = authResponse.assetId;
       debugPrint(`DEBUG: Asset uploaded successfully, ID: ${assetId}`);
       return assetId;
@@ -207,15 +557,67 @@ export class ImageClassifier {
         `DEBUG: Starting classification for ${imagePath} with task ${task}`
       );
 
-      // Use direct base64 approach only (no cloud upload fallback)
-      debugPrint("DEBUG: Using direct base64 method only - no cloud uploads");
-      return await this.classifyImageDirect(imagePath, task);
+      const key = `${await this.hashFile(imagePath)}:${task}`;
+
+      if (this.cacheEnabled) {
+        const cached = await this.cacheGet(key);
+        if (cached !== undefined) {
+          debugPrint(`DEBUG: Cache hit for ${imagePath}, skipping API call`);
+          return cached;
+        }
+      }
+
+      // Single-flight: concurrent callers for the same bytes+task (e.g. from
+      // overlapping filesystem events in batch mode) share one request
+      // instead of firing duplicates
+      const pending = this.inflight.get(key);
+      if (pending) {
+        debugPrint(`DEBUG: Joining in-flight classification for ${imagePath}`);
+        return await pending;
+      }
+
+      const flight = this.runClassification(imagePath, task);
+      this.inflight.set(key, flight);
+
+      try {
+        const classification = await flight;
+        if (this.cacheEnabled) {
+          await this.cachePut(key, classification);
+        }
+        return classification;
+      } finally {
+        this.inflight.delete(key);
+      }
     } catch (error) {
       debugPrint(`DEBUG: Classification exception: ${error}`);
       throw new Error(`Classification failed: ${error}`);
     }
   }
 
+  /**
+   * Prepare the payload and route it to the inline or asset upload flow.
+   * Inline base64 collapses authorize + upload + classify into a single
+   * round trip; oversized payloads fall back to the asset upload flow.
+   */
+  private async runClassification(
+    imagePath: string,
+    task: string
+  ): Promise<string> {
+    const payload = await this.preparePayload(imagePath);
+
+    if (!this.forceAsset && payload.size <= INLINE_THRESHOLD_BYTES) {
+      debugPrint(
+        `DEBUG: Payload ${payload.size} bytes within inline limit - using direct base64 method`
+      );
+      return await this.classifyPayloadInline(payload, task);
+    }
+
+    debugPrint(
+      `DEBUG: Payload ${payload.size} bytes - using asset upload method`
+    );
+    return await this.classifyImageAsset(imagePath, task, payload);
+  }
+
   /**
    * Classify image using direct base64 encoding
    */
@@ -225,10 +627,52 @@ export class ImageClassifier {
   ): Promise<string> {
     debugPrint(`DEBUG: Trying direct base64 method for ${imagePath}`);
 
-    // Read and encode image as base64
-    const imageBuffer = await fs.readFile(imagePath);
+    const payload = await this.preparePayload(imagePath);
+    return await this.classifyPayloadInline(payload, task);
+  }
+
+  /**
+   * Classify image using the asset upload flow (for payloads too large to
+   * inline as base64)
+   */
+  async classifyImageAsset(
+    imagePath: string,
+    task = "<CAPTION>",
+    preparedPayload?: PreparedPayload
+  ): Promise<string> {
+    const assetId = await this.uploadAsset(
+      imagePath,
+      "Classification image",
+      preparedPayload
+    );
+
+    const content = `${task}<img src="data:image/jpeg;asset_id,${assetId}" />`;
+    const inputs = {
+      messages: [
+        {
+          role: "user",
+          content: content,
+        },
+      ],
+    };
+
+    debugPrint("DEBUG: Classification input prepared (asset upload method)");
+    return await this.sendClassificationRequest(inputs, assetId);
+  }
+
+  /**
+   * Build and send the inline base64 classification request
+   */
+  private async classifyPayloadInline(
+    payload: PreparedPayload,
+    task: string
+  ): Promise<string> {
+    // Encode prepared payload as base64
+    const imageBuffer =
+      payload.data || (await fs.readFile(payload.filePath!));
+    const contentType = payload.contentType;
     const fileSizeKB = Math.round(imageBuffer.length / 1024);
-    debugPrint(`DEBUG: Image file size: ${fileSizeKB}KB`);
+    debugPrint(`DEBUG: Payload size: ${fileSizeKB}KB`);
 
     // Check if image is too large (most APIs have limits around 20MB)
     const maxSizeMB = 20;
@@ -243,12 +687,6 @@ export class ImageClassifier {
     const base64SizeKB = Math.round(base64Image.length / 1024);
     debugPrint(`DEBUG: Base64 size: ${base64SizeKB}KB`);
 
-    // Determine content type
-    let contentType = lookup(imagePath) || "image/jpeg";
-    if (!contentType.startsWith("image/")) {
-      contentType = "image/jpeg";
-    }
-
     // Use simple string format for NVIDIA Florence-2 API
     const content = `${task}<img src="data:${contentType};base64,${base64Image}" />`;
     const inputs = {
@@ -260,41 +698,92 @@ export class ImageClassifier {
       ],
     };
 
+    // Serialize once: the body doubles as the payload-size debug figure and
+    // avoids re-stringifying the multi-hundred-KB base64 blob downstream
+    const body = JSON.stringify(inputs);
     debugPrint("DEBUG: Classification input prepared (direct base64 method)");
     debugPrint(
-      `DEBUG: Total payload size: ~${Math.round(
-        JSON.stringify(inputs).length / 1024
-      )}KB`
+      `DEBUG: Total payload size: ~${Math.round(body.length / 1024)}KB`
     );
-    return await this.sendClassificationRequest(inputs);
+    return await this.sendClassificationRequest(body);
   }
 
   /**
-   * Send classification request to API
+   * Classify multiple images concurrently with a bounded worker pool.
+   * Independent HTTP round trips overlap, so multi-image jobs finish in
+   * roughly total/concurrency time instead of running serially.
+   */
+  async classifyImages(
+    imagePaths: string[],
+    task = "<CAPTION>",
+    concurrency = 10
+  ): Promise<BatchItemResult[]> {
+    const limit = Math.max(1, Math.min(concurrency, imagePaths.length));
+    const results: BatchItemResult[] = new Array(imagePaths.length);
+    let nextIndex = 0;
+
+    debugPrint(
+      `DEBUG: Classifying ${imagePaths.length} images with concurrency ${limit}`
+    );
+
+    const worker = async (): Promise<void> => {
+      while (nextIndex < imagePaths.length) {
+        const index = nextIndex++;
+        const imagePath = imagePaths[index];
+        try {
+          const classification = await this.classifyImage(imagePath, task);
+          results[index] = {
+            image_path: imagePath,
+            success: true,
+            classification,
+          };
+        } catch (error) {
+          results[index] = {
+            image_path: imagePath,
+            success: false,
+            error: error instanceof Error ? error.message : String(error),
+          };
+        }
+      }
+    };
+
+    await Promise.all(Array.from({ length: limit }, () => worker()));
+    return results;
+  }
+
+  /**
+   * Send classification request to API. Accepts either the inputs object or
+   * an already-serialized JSON string so callers can serialize exactly once.
    */
   async sendClassificationRequest(
     inputs: any,
     assetId?: string
   ): Promise<string> {
-    const headers: any = {
-      "Content-Type": "application/json",
-      Authorization: this.headerAuth,
-      Accept: "application/json",
-    };
+    const body = typeof inputs === "string" ? inputs : JSON.stringify(inputs);
 
     // Only add asset headers if we have an assetId (for asset upload method)
-    if (assetId) {
-      headers["NVCF-INPUT-ASSET-REFERENCES"] = assetId;
-      headers["NVCF-FUNCTION-ASSET-IDS"] = assetId;
-    }
+    const headers = assetId
+      ? {
+          ...this.classifyHeaders,
+          "NVCF-INPUT-ASSET-REFERENCES": assetId,
+          "NVCF-FUNCTION-ASSET-IDS": assetId,
+        }
+      : this.classifyHeaders;
 
     debugPrint(`DEBUG: Sending classification request to ${this.apiUrl}`);
 
-    const response = await fetch(this.apiUrl, {
-      method: "POST",
-      headers,
-      body: JSON.stringify(inputs),
-    });
+    const response = await fetchWithRetry(
+      "Classification request",
+      (signal) =>
+        fetch(this.apiUrl, {
+          method: "POST",
+          agent: this.httpsAgent,
+          headers,
+          body,
+          signal,
+        }),
+      CLASSIFY_TIMEOUT_MS
+    );
 
     debugPrint(`DEBUG: Classification response status: ${response.status}`);
 
@@ -354,17 +843,18 @@ export class ImageClassifier {
    */
   private extractZipResponse(zipBuffer: Buffer): string {
     try {
+      // Lazy require: only paid on the first ZIP-format response
+      const AdmZip = require("adm-zip");
       const zip = new AdmZip(zipBuffer);
-      const entries = zip.getEntries();
 
-      const responseEntry = entries.find((entry) =>
-        entry.entryName.endsWith(".response")
-      );
+      // First match wins: bail out of the name scan as soon as the
+      // .response member is found and decompress only that member
+      for (const entry of zip.getEntries()) {
+        if (!entry.entryName.endsWith(".response")) {
+          continue;
+        }
 
-      if (responseEntry) {
-        const jsonContent = JSON.parse(
-          responseEntry.getData().toString("utf8")
-        );
+        const jsonContent = JSON.parse(entry.getData().toString("utf8"));
         let content = jsonContent.choices[0].message.content;
 
         if (content.startsWith("<CAPTION>")) {
@@ -415,6 +905,151 @@ export async function saveClassificationResult(
   return jsonPath;
 }
 
+/**
+ * Run batch classification over a file containing one image path per line
+ */
+async function runBatch(
+  batchFile: string,
+  outputDir: string,
+  task: string,
+  concurrency: number,
+  options: ClassifierOptions = {}
+): Promise<void> {
+  const content = await fs.readFile(batchFile, "utf8");
+  const imagePaths = content
+    .split("\n")
+    .map((line) => line.trim())
+    .filter((line) => line.length > 0);
+
+  if (imagePaths.length === 0) {
+    throw new Error(`No image paths found in batch file: ${batchFile}`);
+  }
+
+  debugPrint(`DEBUG: Batch mode: ${imagePaths.length} images from ${batchFile}`);
+
+  const classifier = new ImageClassifier(
+    undefined,
+    undefined,
+    undefined,
+    options
+  );
+  const batchResults = await classifier.classifyImages(
+    imagePaths,
+    task,
+    concurrency
+  );
+
+  let failures = 0;
+  for (const item of batchResults) {
+    if (item.success && item.classification) {
+      const resultPath = await saveClassificationResult(
+        item.image_path,
+        item.classification,
+        outputDir
+      );
+      const result: ClassificationResult = {
+        success: true,
+        classification: item.classification,
+        result_file: resultPath,
+        image_file: path.basename(item.image_path),
+      };
+      console.log("CLASSIFICATION_RESULT:" + JSON.stringify(result));
+    } else {
+      failures++;
+      const result: ClassificationResult = {
+        success: false,
+        error: item.error,
+        image_file: path.basename(item.image_path),
+      };
+      console.log("CLASSIFICATION_RESULT:" + JSON.stringify(result));
+    }
+  }
+
+  if (failures === batchResults.length) {
+    throw new Error("All batch classifications failed");
+  }
+}
+
+/**
+ * Long-running worker mode: read one request per line from stdin (a bare
+ * image path, or {"path": ..., "task": ...}) and emit a
+ * CLASSIFICATION_RESULT: line per request. A parent process can feed many
+ * images to one worker instead of paying process startup per image.
+ */
+async function runServe(
+  outputDir: string,
+  defaultTask: string,
+  options: ClassifierOptions = {}
+): Promise<void> {
+  // Lazy require: only the serve mode pays for readline
+  const readline = require("readline");
+
+  const classifier = new ImageClassifier(
+    undefined,
+    undefined,
+    undefined,
+    options
+  );
+  const rl = readline.createInterface({
+    input: process.stdin,
+    terminal: false,
+  });
+
+  debugPrint(`DEBUG: Serve mode: reading requests from stdin`);
+
+  for await (const line of rl) {
+    const trimmed = line.trim();
+    if (!trimmed) {
+      continue;
+    }
+
+    let imagePath = trimmed;
+    let task = defaultTask;
+    if (trimmed.startsWith("{")) {
+      try {
+        const request = JSON.parse(trimmed);
+        if (typeof request.path !== "string" || request.path.length === 0) {
+          throw new Error('request must have a non-empty string "path"');
+        }
+        imagePath = request.path;
+        task = typeof request.task === "string" ? request.task : defaultTask;
+      } catch (error) {
+        const result: ClassificationResult = {
+          success: false,
+          error: `Invalid request line: ${
+            error instanceof Error ? error.message : String(error)
+          }`,
+        };
+        console.log("CLASSIFICATION_RESULT:" + JSON.stringify(result));
+        continue;
+      }
+    }
+
+    try {
+      const classification = await classifier.classifyImage(imagePath, task);
+      const resultPath = await saveClassificationResult(
+        imagePath,
+        classification,
+        outputDir
+      );
+      const result: ClassificationResult = {
+        success: true,
+        classification,
+        result_file: resultPath,
+        image_file: path.basename(imagePath),
+      };
+      console.log("CLASSIFICATION_RESULT:" + JSON.stringify(result));
+    } catch (error) {
+      const result: ClassificationResult = {
+        success: false,
+        error: error instanceof Error ? error.message : String(error),
+        image_file: path.basename(imagePath),
+      };
+      console.log("CLASSIFICATION_RESULT:" + JSON.stringify(result));
+    }
+  }
+}
+
 /**
  * Main function for command-line usage
  */
@@ -423,29 +1058,98 @@ async function main(): Promise<void> {
 
   if (args.length < 2) {
     console.error(
-      "Usage: node imageClassifier.js <image_path> <output_dir> [--task <task>] [--debug]"
+      "Usage: node imageClassifier.js <image_path> <output_dir> [--task <task>] [--debug]\n" +
+        "       node imageClassifier.js --batch <paths_file> <output_dir> [--task <task>] [--concurrency <n>] [--debug]\n" +
+        "       node imageClassifier.js --serve <output_dir> [--task <task>] [--debug]"
     );
     process.exit(1);
   }
 
-  const imagePath = args[0];
-  const outputDir = args[1];
+  const batchMode = args[0] === "--batch";
+  const serveMode = args[0] === "--serve";
+  const imagePath = batchMode ? args[1] : serveMode ? "" : args[0];
+  const outputDir = batchMode ? args[2] : args[1];
   let task = "<CAPTION>";
+  let concurrency = 10;
+  let maxEdge = DEFAULT_MAX_EDGE;
+  let jpegQuality = DEFAULT_JPEG_QUALITY;
+  let cacheEnabled = true;
+  let cacheTtlMs = 0;
+  let forceAsset = false;
 
   // Parse optional arguments
-  for (let i = 2; i < args.length; i++) {
+  for (let i = batchMode ? 3 : 2; i < args.length; i++) {
     if (args[i] === "--task" && i + 1 < args.length) {
       task = args[i + 1];
       i++;
+    } else if (args[i] === "--concurrency" && i + 1 < args.length) {
+      concurrency = parseInt(args[i + 1], 10) || 10;
+      i++;
+    } else if (args[i] === "--max-edge" && i + 1 < args.length) {
+      maxEdge = parseInt(args[i + 1], 10) || DEFAULT_MAX_EDGE;
+      i++;
+    } else if (args[i] === "--jpeg-quality" && i + 1 < args.length) {
+      jpegQuality = parseInt(args[i + 1], 10) || DEFAULT_JPEG_QUALITY;
+      i++;
+    } else if (args[i] === "--no-cache") {
+      cacheEnabled = false;
+    } else if (args[i] === "--force-asset") {
+      forceAsset = true;
+    } else if (args[i] === "--cache-ttl" && i + 1 < args.length) {
+      cacheTtlMs = (parseInt(args[i + 1], 10) || 0) * 1000;
+      i++;
     } else if (args[i] === "--debug") {
       DEBUG_MODE = true;
     }
   }
 
+  if (serveMode) {
+    try {
+      await runServe(outputDir, task, {
+        maxEdge,
+        jpegQuality,
+        cacheEnabled,
+        cacheTtlMs,
+        forceAsset,
+      });
+    } catch (error) {
+      const errorMessage =
+        error instanceof Error ? error.message : String(error);
+      console.error(`ERROR: ${errorMessage}`);
+      process.exit(1);
+    }
+    return;
+  }
+
+  if (batchMode) {
+    if (!outputDir) {
+      console.error(
+        "Usage: node imageClassifier.js --batch <paths_file> <output_dir> [--task <task>] [--concurrency <n>] [--debug]"
+      );
+      process.exit(1);
+    }
+
+    try {
+      await runBatch(imagePath, outputDir, task, concurrency, {
+        maxEdge,
+        jpegQuality,
+        cacheEnabled,
+        cacheTtlMs,
+        forceAsset,
+      });
+    } catch (error) {
+      const errorMessage =
+        error instanceof Error ? error.message : String(error);
+      console.error(`ERROR: ${errorMessage}`);
+      process.exit(1);
+    }
+    return;
+  }
+
   try {
     // Debug logging
     debugPrint(
-      `DEBUG: TypeScript script started with args: ${JSON.stringify(args)}`
+      () => `DEBUG: TypeScript script started with args: ${JSON.stringify(args)}`
     );
     debugPrint(`DEBUG: Current working directory: ${process.cwd()}`);
     debugPrint(`DEBUG: Node version: ${process.version}`);
@@ -460,13 +1164,13 @@ async function main(): Promise<void> {
     }
     debugPrint(`DEBUG: API key is present (length: ${API_KEY.length})`);
 
-    // Validate inputs
-    if (!existsSync(imagePath)) {
+    // Validate inputs and check file size without blocking the event loop
+    let stats;
+    try {
+      stats = await fs.stat(imagePath);
+    } catch (error) {
       throw new Error(`Image file not found: ${imagePath}`);
     }
-
-    // Check file size
-    const stats = statSync(imagePath);
     const fileSize = stats.size;
     debugPrint(`DEBUG: Image file size: ${fileSize} bytes`);
 
@@ -476,12 +1180,22 @@ async function main(): Promise<void> {
 
     // Initialize classifier and process image
     debugPrint("DEBUG: Initializing classifier...");
-    const classifier = new ImageClassifier();
+    const classifier = new ImageClassifier(undefined, undefined, undefined, {
+      maxEdge,
+      jpegQuality,
+      cacheEnabled,
+      cacheTtlMs,
+      forceAsset,
+    });
 
     debugPrint("DEBUG: Starting classification...");
     const classification = await classifier.classifyImage(imagePath, task);
     debugPrint(
-      `DEBUG: Classification completed: ${classification.substring(0, 100)}...`
+      () =>
+        `DEBUG: Classification completed: ${classification.substring(
+          0,
+          100
+        )}...`
     );
 
     const resultPath = await saveClassificationResult(
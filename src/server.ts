@@ -32,8 +32,12 @@ const classificationDir = path.join(
 let activeStreams = new Map<string, NodeJS.Timeout>();
 let frameCount = 0;
 
-// Initialize services
-const imageClassifier = new ImageClassifier();
+// Initialize services. Every captured frame is byte-distinct, so the
+// content-hash result cache would only accumulate misses in this
+// long-running process - keep it off here.
+const imageClassifier = new ImageClassifier(undefined, undefined, undefined, {
+  cacheEnabled: false,
+});
 const safetyAlertNotifier = new SafetyAlertNotifier();
 
 // Set debug mode based on config
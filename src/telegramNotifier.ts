@@ -6,9 +6,23 @@
  * Designed for real-time security monitoring and emergency response
  */
 
-import { createReadStream, existsSync } from "fs";
+import { createReadStream } from "fs";
+import { access } from "fs/promises";
+import { Agent } from "https";
 import fetch from "node-fetch";
-import FormData from "form-data";
+import { fetchWithRetry } from "./httpRetry";
+
+// Shared keep-alive agent so consecutive Telegram API calls reuse the same
+// TCP+TLS connection instead of reconnecting for every alert
+const httpsAgent = new Agent({
+  keepAlive: true,
+  keepAliveMsecs: 30000,
+  maxSockets: 8,
+});
+
+// Alerts are time-sensitive: better to fail (and retry) fast than hang on
+// the OS default socket timeout
+const TELEGRAM_TIMEOUT_MS = 30_000;
 
 // Types
 interface TelegramResponse {
@@ -53,13 +67,30 @@ if (notificationsEnabled && (!BOT_TOKEN || !CHAT_ID)) {
   );
 }
 
+// Async existence check so alert sends don't block the server's event loop
+async function fileExists(filePath: string): Promise<boolean> {
+  try {
+    await access(filePath);
+    return true;
+  } catch (error) {
+    return false;
+  }
+}
+
 export class SafetyAlertNotifier {
   private botToken: string;
   private chatId: string;
+  private sendPhotoUrl: string;
+  private sendMessageUrl: string;
 
   constructor(botToken?: string, chatId?: string) {
     this.botToken = botToken || BOT_TOKEN || "";
     this.chatId = chatId || CHAT_ID || "";
+
+    // Bot API endpoints are fixed per token - build them once
+    const apiBase = `https://api.telegram.org/bot${this.botToken}`;
+    this.sendPhotoUrl = `${apiBase}/sendPhoto`;
+    this.sendMessageUrl = `${apiBase}/sendMessage`;
   }
 
   /**
@@ -113,24 +144,36 @@ export class SafetyAlertNotifier {
    * Send photo with caption to Telegram
    */
   async sendPhoto(imagePath: string, caption: string): Promise<boolean> {
-    const url = `https://api.telegram.org/bot${this.botToken}/sendPhoto`;
+    const url = this.sendPhotoUrl;
 
     try {
-      if (!existsSync(imagePath)) {
+      if (!(await fileExists(imagePath))) {
         console.log(`Image file not found: ${imagePath} ❌`);
         return false;
       }
 
-      const form = new FormData();
-      form.append("chat_id", this.chatId);
-      form.append("caption", caption);
-      form.append("photo", createReadStream(imagePath));
-
-      const response = await fetch(url, {
-        method: "POST",
-        body: form,
-        headers: form.getHeaders(),
-      });
+      // Lazy require: only paid when a photo is actually sent
+      const FormData = require("form-data");
+
+      // The form (and its file stream) is rebuilt per attempt because a
+      // consumed stream cannot be replayed on retry
+      const response = await fetchWithRetry(
+        "Telegram sendPhoto",
+        (signal) => {
+          const form = new FormData();
+          form.append("chat_id", this.chatId);
+          form.append("caption", caption);
+          form.append("photo", createReadStream(imagePath));
+          return fetch(url, {
+            method: "POST",
+            agent: httpsAgent,
+            body: form,
+            headers: form.getHeaders(),
+            signal,
+          });
+        },
+        TELEGRAM_TIMEOUT_MS
+      );
 
       const result = (await response.json()) as TelegramResponse;
 
@@ -153,19 +196,26 @@ export class SafetyAlertNotifier {
    * Send text message to Telegram
    */
   async sendMessage(text: string): Promise<boolean> {
-    const url = `https://api.telegram.org/bot${this.botToken}/sendMessage`;
+    const url = this.sendMessageUrl;
 
     try {
-      const response = await fetch(url, {
-        method: "POST",
-        headers: {
-          "Content-Type": "application/json",
-        },
-        body: JSON.stringify({
-          chat_id: this.chatId,
-          text,
-        }),
-      });
+      const response = await fetchWithRetry(
+        "Telegram sendMessage",
+        (signal) =>
+          fetch(url, {
+            method: "POST",
+            agent: httpsAgent,
+            headers: {
+              "Content-Type": "application/json",
+            },
+            body: JSON.stringify({
+              chat_id: this.chatId,
+              text,
+            }),
+            signal,
+          }),
+        TELEGRAM_TIMEOUT_MS
+      );
 
       const result = (await response.json()) as TelegramResponse;
 
@@ -198,7 +248,7 @@ export class SafetyAlertNotifier {
     const alertMessage = this.formatSafetyAlert(options);
 
     // Try to send photo with alert caption if image path is provided
-    if (options.image && existsSync(options.image)) {
+    if (options.image && (await fileExists(options.image))) {
       console.log(`📷 Sending evidence photo: ${options.image}`);
       const success = await this.sendPhoto(options.image, alertMessage);
 